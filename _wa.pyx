@@ -0,0 +1,194 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Weiler-Atherton 结果环跟踪的 C 实现。
+
+节点链表被压平成 SoA 数组（坐标、交点标记、入点标记、邻居下标、
+所在环的起止偏移），跟踪循环全部在 C 层完成，语义与
+weiler_atherton.build_results_from_nodes 一致。
+"""
+
+from libc.stdlib cimport malloc, realloc, free
+
+cdef double EPS = 1e-8
+cdef double EPS2 = 1e-8 * 1e-8
+
+
+cdef inline bint _pt_eq(double ax, double ay, double bx, double by) nogil:
+    cdef double dx = ax - bx
+    cdef double dy = ay - by
+    return dx * dx + dy * dy <= EPS2
+
+
+def trace_results(double[::1] sx, double[::1] sy,
+                  signed char[::1] s_inter, signed char[::1] s_entry,
+                  long long[::1] s_neighbor,
+                  long long[::1] s_lo, long long[::1] s_hi,
+                  double[::1] cx, double[::1] cy,
+                  signed char[::1] c_inter,
+                  long long[::1] c_neighbor,
+                  long long[::1] c_lo, long long[::1] c_hi,
+                  long long[::1] s_starts):
+    """
+    按 Weiler-Atherton 规则从主侧每个未访问交点出发跟踪结果环。
+    s_* / c_* 分别是主侧与裁剪侧压平后的节点数组；neighbor 为另一侧
+    的全局下标（无邻居为 -1）；lo/hi 为该节点所在环的 [lo, hi) 偏移；
+    s_starts 是调用方预筛并按 (x, y) 排序的主侧入点下标。
+    返回环列表（每环为 (x, y) 元组列表）。
+    """
+    cdef Py_ssize_t ns = sx.shape[0]
+    cdef Py_ssize_t nc = cx.shape[0]
+    cdef Py_ssize_t nstart = s_starts.shape[0]
+    cdef Py_ssize_t start, i_idx, j, k, ki, safety
+    cdef int side            # 0 = 主侧, 1 = 裁剪侧
+    cdef double last_x, last_y, nx, ny, first_x, first_y
+    cdef list results = []
+    cdef list pts
+
+    # 环顶点先写进 C double 缓冲（追加时已做相邻去重），
+    # 只在环成立后一次性转成元组列表，避免逐点经手 Python 对象
+    cdef Py_ssize_t cap = 64
+    cdef Py_ssize_t cnt
+    cdef double *rx = NULL
+    cdef double *ry = NULL
+    cdef double *tmp = NULL
+
+    cdef signed char *s_visited = NULL
+    cdef signed char *c_visited = NULL
+    s_visited = <signed char *> malloc(ns if ns > 0 else 1)
+    c_visited = <signed char *> malloc(nc if nc > 0 else 1)
+    rx = <double *> malloc(cap * sizeof(double))
+    ry = <double *> malloc(cap * sizeof(double))
+    if s_visited == NULL or c_visited == NULL or rx == NULL or ry == NULL:
+        if s_visited != NULL:
+            free(s_visited)
+        if c_visited != NULL:
+            free(c_visited)
+        if rx != NULL:
+            free(rx)
+        if ry != NULL:
+            free(ry)
+        raise MemoryError()
+    for j in range(ns):
+        s_visited[j] = 0
+    for j in range(nc):
+        c_visited[j] = 0
+
+    try:
+        # s_starts 已筛出按 (x, y) 排序的入点，出点与普通顶点不再参与扫描
+        for ki in range(nstart):
+            start = s_starts[ki]
+            if s_visited[start]:
+                continue
+            if s_neighbor[start] < 0:
+                # 孤立交点，标记并跳过
+                s_visited[start] = 1
+                continue
+
+            side = 0
+            i_idx = start
+            first_x = sx[start]
+            first_y = sy[start]
+            rx[0] = first_x
+            ry[0] = first_y
+            cnt = 1
+            last_x = first_x
+            last_y = first_y
+
+            safety = 0
+            while True:
+                safety += 1
+                if safety > 100000:
+                    break
+
+                if side == 0:
+                    j = i_idx
+                    while True:
+                        j = j + 1
+                        if j >= s_hi[i_idx]:
+                            j = s_lo[i_idx]
+                        nx = sx[j]
+                        ny = sy[j]
+                        if not _pt_eq(last_x, last_y, nx, ny):
+                            if cnt == cap:
+                                cap = cap * 2
+                                tmp = <double *> realloc(rx, cap * sizeof(double))
+                                if tmp == NULL:
+                                    raise MemoryError()
+                                rx = tmp
+                                tmp = <double *> realloc(ry, cap * sizeof(double))
+                                if tmp == NULL:
+                                    raise MemoryError()
+                                ry = tmp
+                            rx[cnt] = nx
+                            ry[cnt] = ny
+                            cnt += 1
+                            last_x = nx
+                            last_y = ny
+                        if s_inter[j]:
+                            s_visited[j] = 1
+                            if s_neighbor[j] >= 0:
+                                c_visited[s_neighbor[j]] = 1
+                                i_idx = s_neighbor[j]
+                                side = 1
+                            else:
+                                i_idx = j
+                            break
+                        if j == i_idx:
+                            break
+                else:
+                    j = i_idx
+                    while True:
+                        j = j + 1
+                        if j >= c_hi[i_idx]:
+                            j = c_lo[i_idx]
+                        nx = cx[j]
+                        ny = cy[j]
+                        if not _pt_eq(last_x, last_y, nx, ny):
+                            if cnt == cap:
+                                cap = cap * 2
+                                tmp = <double *> realloc(rx, cap * sizeof(double))
+                                if tmp == NULL:
+                                    raise MemoryError()
+                                rx = tmp
+                                tmp = <double *> realloc(ry, cap * sizeof(double))
+                                if tmp == NULL:
+                                    raise MemoryError()
+                                ry = tmp
+                            rx[cnt] = nx
+                            ry[cnt] = ny
+                            cnt += 1
+                            last_x = nx
+                            last_y = ny
+                        if c_inter[j]:
+                            c_visited[j] = 1
+                            if c_neighbor[j] >= 0:
+                                s_visited[c_neighbor[j]] = 1
+                                i_idx = c_neighbor[j]
+                                side = 0
+                            else:
+                                i_idx = j
+                            break
+                        if j == i_idx:
+                            break
+
+                # 结束条件：回到起点交点（坐标闭合，或回到起点节点）
+                if _pt_eq(first_x, first_y, last_x, last_y):
+                    if cnt >= 2:
+                        cnt -= 1
+                    break
+                if side == 0 and i_idx == start and s_visited[start]:
+                    break
+
+            # 追加时已保证相邻点互异，这里只需按长度取舍
+            if cnt >= 3:
+                pts = [None] * cnt
+                for k in range(cnt):
+                    pts[k] = (rx[k], ry[k])
+                results.append(pts)
+    finally:
+        free(s_visited)
+        free(c_visited)
+        free(rx)
+        free(ry)
+
+    return results
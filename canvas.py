@@ -4,48 +4,149 @@ CanvasWidget: 负责绘制、鼠标交互
 """
 
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import pyqtSignal, QPointF, Qt
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor
-from geometry import PolygonModel, is_ccw
-from weiler_atherton import weiler_atherton_clip
+from PyQt5.QtCore import pyqtSignal, QPointF, QRect, QRectF, QTimer, Qt
+from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QPolygonF
+import numpy as np
+
+try:
+    from PyQt5 import sip
+except ImportError:
+    sip = None
+
+from geometry import PolygonModel, is_ccw, is_convex, point_in_polygon_with_holes
+from weiler_atherton import weiler_atherton_clip, sutherland_hodgman_clip
 from geometry import is_ccw, PolygonModel
 
 
+def _qpolyf_from_points(pts) -> QPolygonF:
+    """
+    从 (n,2) 坐标批量构造 QPolygonF：通过 sip 直写底层 QPointF 缓冲，
+    避免逐点分配 N 个 QPointF Python 对象；sip 接口不可用时退回列表构造。
+    """
+    arr = np.ascontiguousarray(pts, dtype=np.float64).reshape(-1, 2)
+    n = len(arr)
+    if sip is None or n == 0:
+        return QPolygonF([QPointF(x, y) for x, y in arr])
+    try:
+        qpoly = QPolygonF(n)
+        vp = qpoly.data()
+        vp.setsize(n * 16)  # n 个 QPointF，每个 2 x float64
+        np.frombuffer(vp, dtype=np.float64)[:] = arr.ravel()
+        return qpoly
+    except (TypeError, ValueError):
+        return QPolygonF([QPointF(x, y) for x, y in arr])
+
+
 class CanvasWidget(QWidget):
     polygon_added = pyqtSignal()
     polygons_changed = pyqtSignal()
 
+    # 常量画笔/画刷：类级缓存，避免每次 paintEvent 重新分配
+    _PEN_CLIP = QPen(QColor(255, 0, 0), 2)            # 裁剪多边形：红色实线
+    _PEN_MAIN = QPen(QColor(0, 0, 0), 2)              # 主多边形：黑色实线
+    _PEN_DRAFT = QPen(QColor(128, 128, 128), 2)       # 绘制区：灰色实线
+    _PEN_CURRENT = QPen(QColor(50, 50, 150), 2)       # 未闭合环：蓝色实线
+    _PEN_CURRENT_DASH = QPen(QColor(50, 50, 150), 1, Qt.DashLine)  # 已闭合环
+    _BRUSH_BG = QBrush(QColor(255, 255, 255))
+    _BRUSH_RESULT = QBrush(QColor(0, 255, 0, 100))    # 半透明绿色填充
+    _BRUSH_POINT = QBrush(QColor(0, 0, 0))
+
     def __init__(self):
         super().__init__()
         self.setMouseTracking(True)
         self.setFocusPolicy(Qt.ClickFocus)
         self.polygons = []  # 已构建的多边形列表
         self.current_rings = []  # list[list[(x,y)]]
-        self.current_ring_points = []  # 当前未闭合环的点数组
+        # 当前未闭合环：按需倍增的 (cap,2) float64 缓冲，避免逐点装箱
+        self._cur_pts = np.empty((16, 2), dtype=np.float64)
+        self._cur_n = 0
 
         # 裁剪结果存储为多边形列表
         self.clip_result_polygons = []
 
         self.info_text = "左键：添加点；右键/闭合按钮：闭合环；构建完成：结束一个多边形"
 
+        # 重绘合并：16ms 单次定时器把密集的重绘请求压到 ≤60fps，
+        # 期间的脏矩形做并集后一次提交
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(16)
+        self._repaint_timer.timeout.connect(self._do_update)
+        self._dirty_rect = QRect()
+
+    def _request_repaint(self, rect=None):
+        """请求重绘；rect 为 None 表示整幅画布"""
+        if rect is None:
+            self._dirty_rect = self.rect()
+        elif self._dirty_rect.isNull():
+            self._dirty_rect = QRect(rect)
+        else:
+            self._dirty_rect = self._dirty_rect.united(rect)
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
+
+    def _do_update(self):
+        rect = self._dirty_rect
+        self._dirty_rect = QRect()
+        if rect.isNull():
+            rect = self.rect()
+        super().update(rect)
+
+    @property
+    def current_ring_points(self):
+        """当前未闭合环的点，(n,2) float64 视图"""
+        return self._cur_pts[:self._cur_n]
+
+    @current_ring_points.setter
+    def current_ring_points(self, pts):
+        pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+        n = len(pts)
+        if n > len(self._cur_pts):
+            self._cur_pts = np.empty((max(16, n * 2), 2), dtype=np.float64)
+        self._cur_pts[:n] = pts
+        self._cur_n = n
+
+    def _append_current_point(self, x, y):
+        """向当前环缓冲追加一个点，容量不足时倍增"""
+        if self._cur_n >= len(self._cur_pts):
+            grown = np.empty((len(self._cur_pts) * 2, 2), dtype=np.float64)
+            grown[:self._cur_n] = self._cur_pts
+            self._cur_pts = grown
+        self._cur_pts[self._cur_n] = (x, y)
+        self._cur_n += 1
+
+    # 脏矩形外扩：画笔宽度 + 顶点圆点半径 + 抗锯齿余量
+    _DIRTY_PAD = 8
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             pt = (event.x(), event.y())
-            self.current_ring_points.append(pt)
-            self.update()
+            prev = tuple(self._cur_pts[self._cur_n - 1]) if self._cur_n else pt
+            self._append_current_point(*pt)
+            # 只重绘新增线段的包围盒，避免整幅画布无效化
+            pad = self._DIRTY_PAD
+            x0 = min(prev[0], pt[0]) - pad
+            y0 = min(prev[1], pt[1]) - pad
+            x1 = max(prev[0], pt[0]) + pad
+            y1 = max(prev[1], pt[1]) + pad
+            self._request_repaint(
+                QRect(int(x0), int(y0), int(x1 - x0), int(y1 - y0)))
         elif event.button() == Qt.RightButton:
             self.close_current_ring()
 
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
-        painter.fillRect(self.rect(), QBrush(QColor(255, 255, 255)))
+        painter.fillRect(self.rect(), self._BRUSH_BG)
+
+        # 脏区域之外的多边形整个跳过
+        clip_rect = QRectF(event.rect())
 
         # 绘制操作区多边形
-        self._draw_operation_polygons(painter)
+        self._draw_operation_polygons(painter, clip_rect)
 
         # 绘制绘制区多边形
-        self._draw_draft_polygons(painter)
+        self._draw_draft_polygons(painter, clip_rect)
 
         if self.clip_result_polygons:
             self._draw_clip_results(painter)
@@ -59,103 +160,111 @@ class CanvasWidget(QWidget):
         rect = self.rect().adjusted(margin, margin, -margin, -margin)
         painter.drawText(rect, Qt.AlignBottom | Qt.AlignLeft, self.info_text)
 
-    def _draw_operation_polygons(self, painter):
+    def _draw_operation_polygons(self, painter, clip_rect=None):
         """绘制操作区多边形"""
         for poly in self.polygons:
             if not getattr(poly, "in_operation_area", False):
                 continue
+            if clip_rect is not None and \
+                    not self._poly_bounds(poly).intersects(clip_rect):
+                continue
 
             if getattr(poly, "is_clipper", False):
-                # 裁剪多边形：红色实线
-                color = QColor(255, 0, 0)
-                pen = QPen(color, 2)
+                painter.setPen(self._PEN_CLIP)
             else:
-                # 主多边形：黑色实线
-                color = QColor(0, 0, 0)
-                pen = QPen(color, 2)
-
-            painter.setPen(pen)
+                painter.setPen(self._PEN_MAIN)
             painter.setBrush(Qt.NoBrush)
 
-            for ring in poly.rings:
-                self._draw_ring(painter, ring)
+            for qpoly in self._ring_qpolys(poly):
+                painter.drawPolygon(qpoly)
 
-    def _draw_draft_polygons(self, painter):
+    def _draw_draft_polygons(self, painter, clip_rect=None):
         """绘制绘制区多边形（灰色实线）"""
         for poly in self.polygons:
             if getattr(poly, "in_operation_area", False):
                 continue
+            if clip_rect is not None and \
+                    not self._poly_bounds(poly).intersects(clip_rect):
+                continue
 
-            color = QColor(128, 128, 128)  # 灰色
-            pen = QPen(color, 2)
-            painter.setPen(pen)
+            painter.setPen(self._PEN_DRAFT)
             painter.setBrush(Qt.NoBrush)
 
-            for ring in poly.rings:
-                self._draw_ring(painter, ring)
+            for qpoly in self._ring_qpolys(poly):
+                painter.drawPolygon(qpoly)
 
     def _draw_clip_results(self, painter):
         """绘制裁剪结果"""
         for poly in self.clip_result_polygons:
             # 高亮填充结果区域，但边框保持原色
-            result_color = QColor(0, 255, 0, 100)  # 半透明绿色填充
-
-            # 填充结果区域
-            painter.setBrush(QBrush(result_color))
+            painter.setBrush(self._BRUSH_RESULT)
             painter.setPen(Qt.NoPen)  # 填充时不要边框
 
-            for ring in poly.rings:
-                if len(ring) >= 3:
-                    polygon_points = [QPointF(x, y) for x, y in ring]
-                    painter.drawPolygon(polygon_points)
+            for qpoly in self._ring_qpolys(poly):
+                if qpoly.size() >= 3:
+                    painter.drawPolygon(qpoly)
 
     def _draw_current_rings(self, painter):
         """绘制当前正在绘制的环"""
         # 当前未闭合环（蓝色实线）
-        pen_blue = QPen(QColor(50, 50, 150), 2)
-        painter.setPen(pen_blue)
+        painter.setPen(self._PEN_CURRENT)
+        painter.setBrush(Qt.NoBrush)  # drawPolygon 只描边不填充
         r = self.current_ring_points
         if len(r) >= 2:
-            for i in range(len(r)-1):
-                painter.drawLine(r[i][0], r[i][1], r[i+1][0], r[i+1][1])
+            # 未闭合：整条折线一次绘制，避免逐边 drawLine 的调用开销
+            painter.drawPolyline(_qpolyf_from_points(r))
 
         # 当前已闭合环（蓝色虚线）
-        pen_blue_dash = QPen(QColor(50, 50, 150), 1, Qt.DashLine)
-        painter.setPen(pen_blue_dash)
+        painter.setPen(self._PEN_CURRENT_DASH)
         for r in self.current_rings:
             self._draw_ring(painter, r)
 
         # 绘制点
-        painter.setBrush(QBrush(QColor(0, 0, 0)))
+        painter.setBrush(self._BRUSH_POINT)
         for r in self.current_rings:
             for x, y in r:
                 painter.drawEllipse(QPointF(x, y), 3, 3)
         for x, y in self.current_ring_points:
             painter.drawEllipse(QPointF(x, y), 3, 3)
 
+    def _poly_bounds(self, poly):
+        """多边形所有环的整体包围矩形（含画笔外扩），缓存在模型实例上"""
+        poly._check_caches()
+        bounds = getattr(poly, "_bounds_rect", None)
+        if bounds is None:
+            bounds = QRectF()
+            for qpoly in self._ring_qpolys(poly):
+                bounds = bounds.united(qpoly.boundingRect())
+            pad = float(self._DIRTY_PAD)
+            bounds = bounds.adjusted(-pad, -pad, pad, pad)
+            poly._bounds_rect = bounds
+        return bounds
+
+    def _ring_qpolys(self, poly):
+        """取多边形各环的 QPolygonF（缓存在模型实例上，首次绘制时构建）"""
+        poly._check_caches()
+        qpolys = getattr(poly, "_qpolys", None)
+        if qpolys is None:
+            qpolys = [_qpolyf_from_points(ring) for ring in poly.rings]
+            poly._qpolys = qpolys
+        return qpolys
+
     def _draw_ring(self, painter, ring):
-        """绘制一个环"""
-        n = len(ring)
-        if n >= 2:
-            for i in range(n-1):
-                painter.drawLine(ring[i][0], ring[i][1],
-                                 ring[i+1][0], ring[i+1][1])
-            # 闭合最后一条边
-            if ring[0] != ring[-1]:
-                painter.drawLine(ring[-1][0], ring[-1][1],
-                                 ring[0][0], ring[0][1])
+        """绘制一个环（整环一次提交给 Qt，闭合由 drawPolygon 完成）"""
+        if len(ring) >= 2:
+            painter.drawPolygon(_qpolyf_from_points(ring))
 
     def close_current_ring(self):
         """闭合当前环"""
-        if len(self.current_ring_points) < 3:
+        if self._cur_n < 3:
             return False
 
-        ring = list(self.current_ring_points)
+        ring = [(float(x), float(y)) for x, y in self.current_ring_points]
         if len(ring) > 1 and ring[0] == ring[-1]:
             ring = ring[:-1]
         self.current_rings.append(ring)
-        self.current_ring_points = []
-        self.update()
+        self._cur_n = 0
+        self._request_repaint()
         return True
 
     def finish_building_polygon(self):
@@ -189,7 +298,7 @@ class CanvasWidget(QWidget):
         self.polygons.append(poly)
         self.current_rings = []
         self.polygon_added.emit()
-        self.update()
+        self._request_repaint()
         return True
 
     def perform_clip_and_show(self):
@@ -209,8 +318,25 @@ class CanvasWidget(QWidget):
         if main_poly is None or clip_poly is None:
             raise RuntimeError("请在操作区放置一个主多边形和一个裁剪多边形")
 
-        # 调用 Weiler-Atherton
-        result_rings = weiler_atherton_clip(main_poly, clip_poly)
+        clip_is_convex = (len(clip_poly.rings) == 1
+                          and is_convex(clip_poly.rings[0]))
+
+        mb = main_poly._bbox[0]
+        cb = clip_poly._bbox[0]
+        if mb[2] < cb[0] or cb[2] < mb[0] or mb[3] < cb[1] or cb[3] < mb[1]:
+            # 外环包围盒不相交：交集必为空，跳过 O(N*M) 求交
+            result_rings = []
+        elif clip_is_convex and all(
+                point_in_polygon_with_holes(c, clip_poly)
+                for c in ((mb[0], mb[1]), (mb[2], mb[1]),
+                          (mb[2], mb[3]), (mb[0], mb[3]))):
+            # 凸裁剪多边形包含主多边形 bbox 的四角 -> 包含整个主多边形
+            result_rings = [list(r) for r in main_poly.rings]
+        elif clip_is_convex:
+            # 凸裁剪多边形走 Sutherland-Hodgman 快速路径
+            result_rings = sutherland_hodgman_clip(main_poly, clip_poly)
+        else:
+            result_rings = weiler_atherton_clip(main_poly, clip_poly)
 
         # 将结果环转换为 PolygonModel 列表
         self.clip_result_polygons = []
@@ -220,12 +346,12 @@ class CanvasWidget(QWidget):
             result_poly.is_result = True
             self.clip_result_polygons.append(result_poly)
 
-        self.update()
+        self._request_repaint()
 
     def clear_all(self):
         """清空所有内容"""
         self.polygons = []
         self.current_rings = []
-        self.current_ring_points = []
+        self._cur_n = 0
         self.clip_result_polygons = []
-        self.update()
+        self._request_repaint()
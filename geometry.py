@@ -1,10 +1,32 @@
 # geometry.py
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from fractions import Fraction
+from typing import List, Tuple, Optional, Union
 import math
 
+import numpy as np
+
+from geometry_fast import (HAS_NUMBA, point_in_ring_nb, seg_intersect_nb,
+                           point_eq_nb, find_all_intersections)
+
+# rtree 为可选依赖，仅用于大环的边索引加速
+try:
+    from rtree import index as _rtree_index
+    HAS_RTREE = True
+except ImportError:
+    HAS_RTREE = False
+
+# shapely 为可选依赖，仅用于大环对求交前的 STR 树包络预筛
+try:
+    import shapely as _shapely
+    from shapely.strtree import STRtree as _STRtree
+    HAS_SHAPELY = True
+except ImportError:
+    HAS_SHAPELY = False
+
 Point = Tuple[float, float]
-Ring = List[Point]
+# 环以 (N,2) float64 ndarray 存储；构造时也接受点列表
+Ring = Union[List[Point], np.ndarray]
 
 
 @dataclass
@@ -13,30 +35,243 @@ class PolygonModel:
     is_main: bool = False
     is_clipper: bool = False
 
+    def __post_init__(self):
+        # 统一转为连续的 (N,2) float64 数组，便于向量化计算
+        self.rings = [np.ascontiguousarray(r, dtype=np.float64).reshape(-1, 2)
+                      for r in self.rings]
+        # SoA 存储：每环一对连续的 x / y 坐标数组，几何内核按列访问时
+        # 缓存行利用率更高（(N,2) 数组按列取值是跨步访问）
+        self.xs = [np.ascontiguousarray(r[:, 0]) for r in self.rings]
+        self.ys = [np.ascontiguousarray(r[:, 1]) for r in self.rings]
+        self._bbox_cache = None
+        self._edge_index_cache: dict = {}
+        self._stripe_index_cache: dict = {}
+        self._edge_meta_cache: dict = {}
+        self._next_cache: dict = {}
+        # 版本号：环数据每次被修改时 +1，派生缓存按版本惰性失效
+        self._version = 0
+        self._cache_version = 0
+
+    def mark_dirty(self):
+        """
+        环数据被就地修改后调用：版本 +1 并重建 SoA 列。
+        派生缓存（bbox、边索引、条带、元数据表等）在下次访问时按
+        版本号差异重建；未修改时重复裁剪/重绘全部命中旧缓存。
+        """
+        self._version += 1
+        self.rings = [np.ascontiguousarray(r, dtype=np.float64).reshape(-1, 2)
+                      for r in self.rings]
+        self.xs = [np.ascontiguousarray(r[:, 0]) for r in self.rings]
+        self.ys = [np.ascontiguousarray(r[:, 1]) for r in self.rings]
+
+    def _check_caches(self):
+        """版本不一致时清空全部派生缓存（含画布侧挂载的缓存）"""
+        if self._cache_version != self._version:
+            self._bbox_cache = None
+            self._edge_index_cache.clear()
+            self._stripe_index_cache.clear()
+            self._edge_meta_cache.clear()
+            self._next_cache.clear()
+            for attr in ("_qpolys", "_bounds_rect"):
+                if hasattr(self, attr):
+                    delattr(self, attr)
+            self._cache_version = self._version
+
+    def _soa_next(self, ring_idx: int):
+        """
+        指定环每个顶点的后继坐标数组 (xs_next, ys_next)，惰性缓存。
+        配合 xs/ys 可以整环向量化遍历边，省去逐顶点的 (i+1)%n。
+        """
+        self._check_caches()
+        entry = self._next_cache.get(ring_idx)
+        if entry is None:
+            entry = (np.roll(self.xs[ring_idx], -1),
+                     np.roll(self.ys[ring_idx], -1))
+            self._next_cache[ring_idx] = entry
+        return entry
+
+    def _edge_meta(self, ring_idx: int) -> np.ndarray:
+        """
+        指定环的逐边元数据表，形状 (N,8)：
+        x1, y1, dx, dy, minx, maxx, miny, maxy。
+        边上测试/射线测试直接读表，省去每次调用重算 min/max 与差值。
+        """
+        self._check_caches()
+        meta = self._edge_meta_cache.get(ring_idx)
+        if meta is None:
+            xs = self.xs[ring_idx]
+            ys = self.ys[ring_idx]
+            x2 = np.roll(xs, -1)
+            y2 = np.roll(ys, -1)
+            meta = np.empty((len(xs), 8), dtype=np.float64)
+            meta[:, 0] = xs
+            meta[:, 1] = ys
+            meta[:, 2] = x2 - xs
+            meta[:, 3] = y2 - ys
+            meta[:, 4] = np.minimum(xs, x2)
+            meta[:, 5] = np.maximum(xs, x2)
+            meta[:, 6] = np.minimum(ys, y2)
+            meta[:, 7] = np.maximum(ys, y2)
+            self._edge_meta_cache[ring_idx] = meta
+        return meta
+
+    def _edge_index(self, ring_idx: int):
+        """
+        指定环的线段 R 树索引（rtree.index.Index），首次查询时惰性构建。
+        rtree 不可用时返回 None。
+        """
+        if not HAS_RTREE:
+            return None
+        self._check_caches()
+        idx = self._edge_index_cache.get(ring_idx)
+        if idx is None:
+            ring = self.rings[ring_idx]
+            n = len(ring)
+            idx = _rtree_index.Index()
+            for i in range(n):
+                x1, y1 = ring[i]
+                j = (i + 1) % n
+                x2, y2 = ring[j]
+                idx.insert(i, (min(x1, x2), min(y1, y2),
+                               max(x1, x2), max(y1, y2)))
+            self._edge_index_cache[ring_idx] = idx
+        return idx
+
+    def _stripe_index(self, ring_idx: int):
+        """
+        指定环的 y 条带索引：把边按 y 区间装入 K 个水平条带桶，
+        查询时只需扫描点所在条带的边。构建 O(N)，无外部依赖。
+        返回 (ymin, ymax, K, buckets)。
+        """
+        self._check_caches()
+        entry = self._stripe_index_cache.get(ring_idx)
+        if entry is None:
+            ring = self.rings[ring_idx]
+            n = len(ring)
+            ymin = self._bbox[ring_idx][1]
+            ymax = self._bbox[ring_idx][3]
+            k = max(4, int(math.sqrt(n)))
+            height = ymax - ymin
+            buckets: List[List[int]] = [[] for _ in range(k)]
+            if height < EPS:
+                # 退化（水平线状环）：全部边装入单个桶
+                for i in range(n):
+                    buckets[0].append(i)
+            else:
+                scale = k / height
+                ys = self.ys[ring_idx]
+                for i in range(n):
+                    y1 = ys[i]
+                    y2 = ys[(i + 1) % n]
+                    ylo = min(y1, y2) - EPS
+                    yhi = max(y1, y2) + EPS
+                    s0 = max(0, min(k - 1, int((ylo - ymin) * scale)))
+                    s1 = max(0, min(k - 1, int((yhi - ymin) * scale)))
+                    for s in range(s0, s1 + 1):
+                        buckets[s].append(i)
+            entry = (ymin, ymax, k, buckets)
+            self._stripe_index_cache[ring_idx] = entry
+        return entry
+
+    @property
+    def _bbox(self) -> List[Tuple[float, float, float, float]]:
+        """每个环的包围盒 (xmin, ymin, xmax, ymax)，惰性计算并缓存"""
+        self._check_caches()
+        if self._bbox_cache is None:
+            boxes = []
+            for xs, ys in zip(self.xs, self.ys):
+                if len(xs) == 0:
+                    boxes.append((0.0, 0.0, 0.0, 0.0))
+                    continue
+                boxes.append((float(xs.min()), float(ys.min()),
+                              float(xs.max()), float(ys.max())))
+            self._bbox_cache = boxes
+        return self._bbox_cache
+
 
 # 公共常量
 EPS = 1e-8
 
 def signed_area(pts: Ring) -> float:
     """多边形带符号面积（正为逆时针）"""
-    a = 0.0
-    n = len(pts)
-    for i in range(n):
-        x1, y1 = pts[i]
-        x2, y2 = pts[(i+1) % n]
-        a += x1 * y2 - x2 * y1
-    return a / 2.0
+    pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    x = pts[:, 0]
+    y = pts[:, 1]
+    # 向量化的鞋带公式：sum(x_i*y_{i+1} - x_{i+1}*y_i) / 2
+    return 0.5 * float(x @ np.roll(y, -1) - np.roll(x, -1) @ y)
 
 def is_ccw(pts: Ring) -> bool:
     return signed_area(pts) > 0
 
+# Shewchuk 静态滤波误差界系数：|det| 大于 errbound*detsum 时
+# 浮点叉积的符号与精确算术一致，可直接采信
+_ORIENT_ERRBOUND = 3.3306690738754716e-16
+
+
+def _orient2d_exact_sign(ax, ay, bx, by, cx, cy) -> int:
+    """有理数算术下的精确定向符号（滤波不确定时的回退，极少触发）"""
+    fax, fay = Fraction(ax), Fraction(ay)
+    det = ((Fraction(bx) - fax) * (Fraction(cy) - fay)
+           - (Fraction(by) - fay) * (Fraction(cx) - fax))
+    if det > 0:
+        return 1
+    if det < 0:
+        return -1
+    return 0
+
+
+def orient2d(a: Point, b: Point, c: Point) -> float:
+    """
+    鲁棒定向谓词：返回值的符号严格等于精确算术下叉积
+    (b-a) x (c-a) 的符号。先做 Shewchuk 静态滤波，浮点结果落在
+    误差界内时才退到有理数精确重算。
+    """
+    ax, ay = float(a[0]), float(a[1])
+    bx, by = float(b[0]), float(b[1])
+    cx, cy = float(c[0]), float(c[1])
+    detleft = (bx - ax) * (cy - ay)
+    detright = (by - ay) * (cx - ax)
+    det = detleft - detright
+    detsum = abs(detleft) + abs(detright)
+    if abs(det) > _ORIENT_ERRBOUND * detsum:
+        return det
+    return float(_orient2d_exact_sign(ax, ay, bx, by, cx, cy))
+
+
+def is_convex(pts: Ring) -> bool:
+    """判断环是否为凸多边形（相邻三点定向全部同号，共线点忽略）"""
+    pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    if n < 3:
+        return False
+    x, y = pts[:, 0], pts[:, 1]
+    bx, by = np.roll(x, -1), np.roll(y, -1)
+    cx, cy = np.roll(x, -2), np.roll(y, -2)
+    detl = (bx - x) * (cy - y)
+    detr = (by - y) * (cx - x)
+    cross = detl - detr
+    # 滤波：误差界外的符号可信；界内的逐个精确重算（共线触发，极少）
+    unreliable = np.abs(cross) <= _ORIENT_ERRBOUND * (np.abs(detl) + np.abs(detr))
+    signs = np.sign(cross)
+    for k in np.flatnonzero(unreliable):
+        signs[k] = _orient2d_exact_sign(x[k], y[k], bx[k], by[k], cx[k], cy[k])
+    nz = signs[signs != 0]
+    if len(nz) == 0:
+        return False
+    return bool(np.all(nz > 0) or np.all(nz < 0))
+
 # 数值相等
 def almost_equal(a: float, b: float, eps: float = EPS) -> bool:
     return abs(a - b) <= eps
 
-# 点重合
+# 点重合（平方距离比较，省去每次调用的 sqrt）
 def point_eq(a: Point, b: Point, eps: float = EPS) -> bool:
-    return math.hypot(a[0] - b[0], a[1] - b[1]) <= eps
+    if eps == EPS:
+        return bool(point_eq_nb(float(a[0]), float(a[1]),
+                                float(b[0]), float(b[1])))
+    dx = a[0] - b[0]
+    dy = a[1] - b[1]
+    return dx * dx + dy * dy <= eps * eps
 
 # 叉积
 def orient(a: Point, b: Point, c: Point) -> float:
@@ -44,6 +279,16 @@ def orient(a: Point, b: Point, c: Point) -> float:
     return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
 
 
+def on_segment_fast(meta: np.ndarray, p: Point) -> bool:
+    """向量化版 on_segment：点 p 是否落在 meta 表（见 _edge_meta）的任一条边上"""
+    px, py = float(p[0]), float(p[1])
+    cross = meta[:, 2] * (py - meta[:, 1]) - meta[:, 3] * (px - meta[:, 0])
+    hit = ((np.abs(cross) <= EPS)
+           & (px >= meta[:, 4] - EPS) & (px <= meta[:, 5] + EPS)
+           & (py >= meta[:, 6] - EPS) & (py <= meta[:, 7] + EPS))
+    return bool(hit.any())
+
+
 def on_segment(a: Point, b: Point, p: Point) -> bool:
     """判断点 p 是否在线段 ab 上（包含端点）"""
     if abs(orient(a, b, p)) > EPS:
@@ -59,43 +304,259 @@ def seg_intersection(a: Point, b: Point, c: Point, d: Point) -> Optional[Point]:
     计算线段 AB 与 CD 的交点（如果存在单一交点），返回点坐标。
     若平行或完全重合返回 None（重合端点通过 on_segment 方式会被捕捉）。
     """
-    x1, y1 = a
-    x2, y2 = b
-    x3, y3 = c
-    x4, y4 = d
-    denom = (x1-x2)*(y3-y4) - (y1-y2)*(x3-x4)
-    if abs(denom) < EPS:
-        # 平行或共线：只处理端点落在线段上的情况
-        for p in (a, b):
-            if on_segment(c, d, p):
-                return p
-        for p in (c, d):
-            if on_segment(a, b, p):
-                return p
-        return None
-    px = ((x1*y2 - y1*x2)*(x3-x4) - (x1-x2)*(x3*y4 - y3*x4)) / denom
-    py = ((x1*y2 - y1*x2)*(y3-y4) - (y1-y2)*(x3*y4 - y3*x4)) / denom
-    # 检查落在两段范围内
-    if (min(x1, x2)-EPS <= px <= max(x1, x2)+EPS and min(y1, y2)-EPS <= py <= max(y1, y2)+EPS and
-            min(x3, x4)-EPS <= px <= max(x3, x4)+EPS and min(y3, y4)-EPS <= py <= max(y3, y4)+EPS):
-        return (px, py)
-    return None
+    px, py, hit = seg_intersect_nb(float(a[0]), float(a[1]),
+                                   float(b[0]), float(b[1]),
+                                   float(c[0]), float(c[1]),
+                                   float(d[0]), float(d[1]))
+    return (px, py) if hit else None
+
+
+# 边对总数低于该阈值时全量广播比建 STR 树更快
+_STRTREE_MIN_PAIRS = 4096
+
+
+def _candidate_pairs_strtree(x1, y1, x2, y2, x3, y3, x4, y4):
+    """
+    用 STR 树对两组边做包络预筛，返回 bbox 相交的 (a 边下标, b 边下标)
+    候选对数组（按 a、b 下标字典序）。包络外扩 EPS，保证容差内相触的
+    边对不会被漏掉。
+    """
+    tree = _STRtree(_shapely.box(np.minimum(x3, x4) - EPS, np.minimum(y3, y4) - EPS,
+                                 np.maximum(x3, x4) + EPS, np.maximum(y3, y4) + EPS))
+    ii, jj = tree.query(_shapely.box(np.minimum(x1, x2) - EPS, np.minimum(y1, y2) - EPS,
+                                     np.maximum(x1, x2) + EPS, np.maximum(y1, y2) + EPS))
+    order = np.lexsort((jj, ii))
+    return ii[order], jj[order]
+
+
+def _edge_alpha(px, py, x1, y1, x2, y2) -> float:
+    """交点 (px,py) 在边 (x1,y1)->(x2,y2) 上的参数（投影并截断到 [0,1]）"""
+    dx = x2 - x1
+    dy = y2 - y1
+    denom = dx * dx + dy * dy
+    if denom < EPS:
+        return 0.0
+    t = ((px - x1) * dx + (py - y1) * dy) / denom
+    return max(0.0, min(1.0, t))
+
+
+def _quantized_overlap_pairs(x1, y1, x2, y2, x3, y3, x4, y4):
+    """
+    SWAR 式包围盒预筛：把两组边的 bbox 坐标量化到联合包围盒的
+    uint16 格（65536 级），重叠测试变成纯整数比较的广播掩码——
+    无除法、分支可预测。量化格外扩以覆盖 EPS 容差，只会多收
+    候选、不会漏。返回 bbox 重叠的 (i, j) 下标数组（行主序）。
+    """
+    axmin, axmax = np.minimum(x1, x2), np.maximum(x1, x2)
+    aymin, aymax = np.minimum(y1, y2), np.maximum(y1, y2)
+    bxmin, bxmax = np.minimum(x3, x4), np.maximum(x3, x4)
+    bymin, bymax = np.minimum(y3, y4), np.maximum(y3, y4)
+    bx0 = min(axmin.min(), bxmin.min())
+    by0 = min(aymin.min(), bymin.min())
+    sx = 65535.0 / max(max(axmax.max(), bxmax.max()) - bx0, EPS)
+    sy = 65535.0 / max(max(aymax.max(), bymax.max()) - by0, EPS)
+    # 外扩量：至少 1 格，且不小于 EPS 对应的格数
+    pad_x = max(1, int(np.ceil(EPS * sx)))
+    pad_y = max(1, int(np.ceil(EPS * sy)))
+
+    def _q(v, b0, s):
+        return np.clip((v - b0) * s, 0.0, 65535.0).astype(np.uint16)
+
+    qaxmin = np.maximum(_q(axmin, bx0, sx).astype(np.int32) - pad_x, 0).astype(np.uint16)
+    qaymin = np.maximum(_q(aymin, by0, sy).astype(np.int32) - pad_y, 0).astype(np.uint16)
+    qaxmax = np.minimum(_q(axmax, bx0, sx).astype(np.int32) + pad_x, 65535).astype(np.uint16)
+    qaymax = np.minimum(_q(aymax, by0, sy).astype(np.int32) + pad_y, 65535).astype(np.uint16)
+    qbxmin = _q(bxmin, bx0, sx)
+    qbymin = _q(bymin, by0, sy)
+    qbxmax = _q(bxmax, bx0, sx)
+    qbymax = _q(bymax, by0, sy)
+
+    overlap = ((qaxmax[:, None] >= qbxmin[None, :])
+               & (qbxmax[None, :] >= qaxmin[:, None])
+               & (qaymax[:, None] >= qbymin[None, :])
+               & (qbymax[None, :] >= qaymin[:, None]))
+    return np.nonzero(overlap)
+
+
+def _intersect_pairs(x1, y1, x2, y2, x3, y3, x4, y4, rx, ry, sx_, sy_,
+                     ii, jj) -> List[Tuple[int, int, float, float, float, float]]:
+    """对候选 (i, j) 边对做 1 维 gather 求交（平行对退回标量内核）"""
+    results: List[Tuple[int, int, float, float, float, float]] = []
+    if len(ii) == 0:
+        return results
+    ax1, ay1, arx, ary = x1[ii], y1[ii], rx[ii], ry[ii]
+    bx3, by3, bsx, bsy = x3[jj], y3[jj], sx_[jj], sy_[jj]
+    denom = arx * bsy - ary * bsx
+    qx_, qy_ = bx3 - ax1, by3 - ay1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (qx_ * bsy - qy_ * bsx) / denom
+        u = (qx_ * ary - qy_ * arx) / denom
+        px = ax1 + t * arx
+        py = ay1 + t * ary
+    parallel = np.abs(denom) < EPS
+    ok = (~parallel
+          & (px >= np.minimum(ax1, ax1 + arx) - EPS) & (px <= np.maximum(ax1, ax1 + arx) + EPS)
+          & (py >= np.minimum(ay1, ay1 + ary) - EPS) & (py <= np.maximum(ay1, ay1 + ary) + EPS)
+          & (px >= np.minimum(bx3, bx3 + bsx) - EPS) & (px <= np.maximum(bx3, bx3 + bsx) + EPS)
+          & (py >= np.minimum(by3, by3 + bsy) - EPS) & (py <= np.maximum(by3, by3 + bsy) + EPS))
+    ta = np.clip(t, 0.0, 1.0)
+    tb = np.clip(u, 0.0, 1.0)
+    for k in np.flatnonzero(ok):
+        results.append((int(ii[k]), int(jj[k]), float(px[k]), float(py[k]),
+                        float(ta[k]), float(tb[k])))
+    # 平行/共线边对走标量内核（捕捉端点落在另一段上的情况）
+    for k in np.flatnonzero(parallel):
+        i, j = int(ii[k]), int(jj[k])
+        qx, qy, hit = seg_intersect_nb(x1[i], y1[i], x2[i], y2[i],
+                                       x3[j], y3[j], x4[j], y4[j])
+        if hit:
+            results.append((i, j, float(qx), float(qy),
+                            _edge_alpha(qx, qy, x1[i], y1[i], x2[i], y2[i]),
+                            _edge_alpha(qx, qy, x3[j], y3[j], x4[j], y4[j])))
+    return results
+
+
+def batch_seg_intersections(ring_a: Ring, ring_b: Ring) -> List[Tuple[int, int, float, float, float, float]]:
+    """
+    两个环所有边对的批量求交，参数式：r = b-a, s = d-c,
+    denom = r x s, t = (c-a) x s / denom, u = (c-a) x r / denom，
+    交点 = a + t*r。候选对来自三级调度：numba 并行内核（全对）、
+    STR 树包络预筛（大规模）、量化 bbox 重叠掩码（NumPy 退路），
+    平行或共线的边对（很少）退回标量内核处理。
+    返回 (a 边下标, b 边下标, px, py, a 边 alpha, b 边 alpha) 列表，
+    交点语义与逐对调用 seg_intersection 一致。
+    """
+    A = np.asarray(ring_a, dtype=np.float64).reshape(-1, 2)
+    B = np.asarray(ring_b, dtype=np.float64).reshape(-1, 2)
+    n, m = len(A), len(B)
+    if n < 2 or m < 2:
+        return []
+    x1, y1 = A[:, 0], A[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    x3, y3 = B[:, 0], B[:, 1]
+    x4, y4 = np.roll(x3, -1), np.roll(y3, -1)
+    rx, ry = x2 - x1, y2 - y1
+    sx_, sy_ = x4 - x3, y4 - y3
+
+    results: List[Tuple[int, int, float, float, float, float]] = []
+
+    if HAS_NUMBA and not (HAS_SHAPELY and n * m >= _STRTREE_MIN_PAIRS):
+        # numba 并行内核：全对求交（含平行/共线退化分支）一次算完，
+        # 拿回平坦数组再装配成记录
+        ii, jj, ipx, ipy, ta_, tb_ = find_all_intersections(
+            x1, y1, x2, y2, x3, y3, x4, y4)
+        for k in range(len(ii)):
+            results.append((int(ii[k]), int(jj[k]), float(ipx[k]), float(ipy[k]),
+                            float(ta_[k]), float(tb_[k])))
+        return results
+
+    if HAS_SHAPELY and n * m >= _STRTREE_MIN_PAIRS:
+        ii, jj = _candidate_pairs_strtree(x1, y1, x2, y2, x3, y3, x4, y4)
+    else:
+        # NumPy 退路：量化 bbox 掩码先剔除绝大多数不相邻的边对
+        ii, jj = _quantized_overlap_pairs(x1, y1, x2, y2, x3, y3, x4, y4)
+    return _intersect_pairs(x1, y1, x2, y2, x3, y3, x4, y4,
+                            rx, ry, sx_, sy_, ii, jj)
 
 
 def point_in_ring(pt: Point, ring: Ring) -> bool:
     """射线法判断点是否在单个环（简单多边形）内部（含边界视为内部）"""
-    x, y = pt
+    ring = np.ascontiguousarray(ring, dtype=np.float64).reshape(-1, 2)
+    return bool(point_in_ring_nb(ring, float(pt[0]), float(pt[1])))
+
+
+# 边数低于该阈值时线性扫描更快，不值得建条带索引
+_STRIPE_MIN_EDGES = 16
+# 超过该阈值的超大环改用 R 树（查询 O(log N + k)，但构建更贵）
+_RTREE_MIN_EDGES = 1024
+
+
+def point_in_ring_striped(pt: Point, poly: PolygonModel, ring_idx: int = 0) -> bool:
+    """
+    与 point_in_ring 等价，但用环的 y 条带索引只扫描点所在条带的边，
+    平均每次查询 O(N/K)。适合本程序典型的 10~1000 顶点多边形。
+    """
+    ymin, ymax, k, buckets = poly._stripe_index(ring_idx)
+    x, y = float(pt[0]), float(pt[1])
+    if y < ymin - EPS or y > ymax + EPS:
+        return False
+    height = ymax - ymin
+    if height < EPS:
+        s = 0
+    else:
+        s = max(0, min(k - 1, int((y - ymin) * k / height)))
+    meta = poly._edge_meta(ring_idx)
     inside = False
+    for i in buckets[s]:
+        x1, y1, dx, dy, minx, maxx, miny, maxy = meta[i]
+        # 在边上视为内部（读表代替 on_segment 重算 min/max）
+        if abs(dx * (y - y1) - dy * (x - x1)) <= EPS and \
+                minx - EPS <= x <= maxx + EPS and miny - EPS <= y <= maxy + EPS:
+            return True
+        y2 = y1 + dy
+        if (y1 > y) != (y2 > y):
+            xinters = dx * (y - y1) / dy + x1
+            if xinters > x:
+                inside = not inside
+    return inside
+
+
+def point_in_ring_soa(pt: Point, poly: PolygonModel, ring_idx: int = 0) -> bool:
+    """
+    与 point_in_ring 等价的全向量化实现：用预计算的 xs/ys 与后继数组
+    一次算出所有边的射线交叉奇偶，无逐顶点 Python 循环和取模。
+    """
+    xs = poly.xs[ring_idx]
+    ys = poly.ys[ring_idx]
+    if len(xs) == 0:
+        return False
+    xs_next, ys_next = poly._soa_next(ring_idx)
+    x, y = float(pt[0]), float(pt[1])
+    # 在边上视为内部
+    if on_segment_fast(poly._edge_meta(ring_idx), pt):
+        return True
+    cond = (ys > y) != (ys_next > y)
+    if not cond.any():
+        return False
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xint = (xs_next - xs) * (y - ys) / (ys_next - ys) + xs
+    return bool(np.count_nonzero(cond & (xint > x)) & 1)
+
+
+def point_in_ring_indexed(pt: Point, poly: PolygonModel, ring_idx: int = 0) -> bool:
+    """
+    与 point_in_ring 等价的加速入口：小环线性扫描；中等规模用 y 条带
+    索引（构建近零开销）；超大环用线段 R 树（查询 O(log N + k)）。
+    """
+    ring = poly.rings[ring_idx]
     n = len(ring)
-    for i in range(n):
-        x1, y1 = ring[i]
-        x2, y2 = ring[(i+1) % n]
-        # 在边上视为内部
-        if on_segment((x1, y1), (x2, y2), (x, y)):
+    if n < _STRIPE_MIN_EDGES:
+        # 无 numba 时纯 Python 逐边扫描慢，改走整环向量化路径
+        if not HAS_NUMBA:
+            return point_in_ring_soa(pt, poly, ring_idx)
+        return point_in_ring(pt, ring)
+    if n < _RTREE_MIN_EDGES:
+        return point_in_ring_striped(pt, poly, ring_idx)
+    idx = poly._edge_index(ring_idx)
+    if idx is None:
+        return point_in_ring_striped(pt, poly, ring_idx)
+
+    x, y = float(pt[0]), float(pt[1])
+    xmax = poly._bbox[ring_idx][2]
+    if x > xmax + EPS:
+        # 点在环 bbox 右侧，射线不会再命中任何边
+        return False
+    meta = poly._edge_meta(ring_idx)
+    inside = False
+    # 向右的射线（带 EPS 余量以捕捉近水平的边界边）
+    for i in idx.intersection((x - EPS, y - EPS, xmax + EPS, y + EPS)):
+        x1, y1, dx, dy, minx, maxx, miny, maxy = meta[i]
+        if abs(dx * (y - y1) - dy * (x - x1)) <= EPS and \
+                minx - EPS <= x <= maxx + EPS and miny - EPS <= y <= maxy + EPS:
             return True
-        # 射线交点统计
-        if ((y1 > y) != (y2 > y)):
-            xinters = (x2 - x1) * (y - y1) / (y2 - y1) + x1
+        y2 = y1 + dy
+        if (y1 > y) != (y2 > y):
+            xinters = dx * (y - y1) / dy + x1
             if xinters > x:
                 inside = not inside
     return inside
@@ -109,9 +570,19 @@ def point_in_polygon_with_holes(pt: Point, poly: PolygonModel) -> bool:
     """
     if not poly.rings:
         return False
-    if not point_in_ring(pt, poly.rings[0]):
+    boxes = poly._bbox
+    x, y = float(pt[0]), float(pt[1])
+    # 包围盒快速排除：点在外环 bbox 之外必不在多边形内（边界含 EPS 容差）
+    xmin, ymin, xmax, ymax = boxes[0]
+    if (x < xmin - EPS) | (x > xmax + EPS) | (y < ymin - EPS) | (y > ymax + EPS):
+        return False
+    if not point_in_ring_indexed(pt, poly, 0):
         return False
-    for inner in poly.rings[1:]:
-        if point_in_ring(pt, inner):
+    for i in range(1, len(poly.rings)):
+        # 跳过 bbox 不覆盖该点的内环
+        xmin, ymin, xmax, ymax = boxes[i]
+        if (x < xmin - EPS) | (x > xmax + EPS) | (y < ymin - EPS) | (y > ymax + EPS):
+            continue
+        if point_in_ring_indexed(pt, poly, i):
             return False
     return True
@@ -0,0 +1,221 @@
+# geometry_fast.py
+"""
+numba 加速的几何内核。
+
+内核以 (N,2) float64 数组 + 标量坐标为参数，便于 LLVM 生成紧凑的标量循环；
+环境中没有 numba 时退化为同逻辑的纯 Python 实现（njit 变为空装饰器）。
+"""
+import numpy as np
+
+EPS = 1e-8
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        # 降级：原样返回被装饰函数
+        def deco(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return deco
+
+
+@njit(cache=True, fastmath=True)
+def on_segment_nb(ax: float, ay: float, bx: float, by: float,
+                  px: float, py: float) -> bool:
+    """判断点 (px,py) 是否在线段 (ax,ay)-(bx,by) 上（包含端点）"""
+    cross = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+    if abs(cross) > EPS:
+        return False
+    if min(ax, bx) - EPS <= px <= max(ax, bx) + EPS and \
+       min(ay, by) - EPS <= py <= max(ay, by) + EPS:
+        return True
+    return False
+
+
+@njit(cache=True, fastmath=True)
+def point_in_ring_nb(ring: np.ndarray, x: float, y: float) -> bool:
+    """射线法判断点是否在单个环内部（含边界视为内部），ring 为 (N,2) 数组"""
+    inside = False
+    n = ring.shape[0]
+    for i in range(n):
+        x1 = ring[i, 0]
+        y1 = ring[i, 1]
+        j = i + 1 if i + 1 < n else 0
+        x2 = ring[j, 0]
+        y2 = ring[j, 1]
+        # 在边上视为内部
+        if on_segment_nb(x1, y1, x2, y2, x, y):
+            return True
+        # 射线交点统计
+        if (y1 > y) != (y2 > y):
+            xinters = (x2 - x1) * (y - y1) / (y2 - y1) + x1
+            if xinters > x:
+                inside = not inside
+    return inside
+
+
+@njit(cache=True, fastmath=True)
+def orient_nb(ax: float, ay: float, bx: float, by: float,
+              cx: float, cy: float) -> float:
+    """叉积 (b-a) x (c-a)"""
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+@njit(cache=True, fastmath=True)
+def seg_intersect_nb(x1: float, y1: float, x2: float, y2: float,
+                     x3: float, y3: float, x4: float, y4: float):
+    """
+    线段 (x1,y1)-(x2,y2) 与 (x3,y3)-(x4,y4) 的交点。
+    返回 (px, py, hit)；平行/共线时只捕捉端点落在另一段上的情况，
+    与 geometry.seg_intersection 语义一致。
+    """
+    denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    if abs(denom) < EPS:
+        # 平行/共线：一次算好四个叉积和两段 bbox，再做端点在段上判断
+        # （多边形共边时这条退化路径很热，避免 on_segment 的重复算术）
+        abx = x2 - x1
+        aby = y2 - y1
+        cdx = x4 - x3
+        cdy = y4 - y3
+        o_a = cdx * (y1 - y3) - cdy * (x1 - x3)   # orient(c,d,a)
+        o_b = cdx * (y2 - y3) - cdy * (x2 - x3)   # orient(c,d,b)
+        o_c = abx * (y3 - y1) - aby * (x3 - x1)   # orient(a,b,c)
+        o_d = abx * (y4 - y1) - aby * (x4 - x1)   # orient(a,b,d)
+        ab_minx = min(x1, x2) - EPS
+        ab_maxx = max(x1, x2) + EPS
+        ab_miny = min(y1, y2) - EPS
+        ab_maxy = max(y1, y2) + EPS
+        cd_minx = min(x3, x4) - EPS
+        cd_maxx = max(x3, x4) + EPS
+        cd_miny = min(y3, y4) - EPS
+        cd_maxy = max(y3, y4) + EPS
+        if abs(o_a) <= EPS and cd_minx <= x1 <= cd_maxx and cd_miny <= y1 <= cd_maxy:
+            return x1, y1, True
+        if abs(o_b) <= EPS and cd_minx <= x2 <= cd_maxx and cd_miny <= y2 <= cd_maxy:
+            return x2, y2, True
+        if abs(o_c) <= EPS and ab_minx <= x3 <= ab_maxx and ab_miny <= y3 <= ab_maxy:
+            return x3, y3, True
+        if abs(o_d) <= EPS and ab_minx <= x4 <= ab_maxx and ab_miny <= y4 <= ab_maxy:
+            return x4, y4, True
+        return 0.0, 0.0, False
+    a = x1 * y2 - y1 * x2
+    b = x3 * y4 - y3 * x4
+    px = (a * (x3 - x4) - (x1 - x2) * b) / denom
+    py = (a * (y3 - y4) - (y1 - y2) * b) / denom
+    # 检查落在两段范围内
+    if (min(x1, x2) - EPS <= px <= max(x1, x2) + EPS and
+            min(y1, y2) - EPS <= py <= max(y1, y2) + EPS and
+            min(x3, x4) - EPS <= px <= max(x3, x4) + EPS and
+            min(y3, y4) - EPS <= py <= max(y3, y4) + EPS):
+        return px, py, True
+    return 0.0, 0.0, False
+
+
+@njit(cache=True, fastmath=True)
+def seg_intersect_many_nb(axs: np.ndarray, ays: np.ndarray,
+                          bxs: np.ndarray, bys: np.ndarray,
+                          x3: float, y3: float, x4: float, y4: float):
+    """
+    多条边 (axs,ays)-(bxs,bys) 对同一条裁剪边的批量求交。
+    返回 (pxs, pys, hits) 三个数组。
+    """
+    n = axs.shape[0]
+    pxs = np.empty(n, dtype=np.float64)
+    pys = np.empty(n, dtype=np.float64)
+    hits = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        px, py, hit = seg_intersect_nb(axs[i], ays[i], bxs[i], bys[i],
+                                       x3, y3, x4, y4)
+        pxs[i] = px
+        pys[i] = py
+        hits[i] = hit
+    return pxs, pys, hits
+
+
+@njit(cache=True, fastmath=True)
+def point_eq_nb(ax: float, ay: float, bx: float, by: float) -> bool:
+    """两点在 EPS 容差内视为同一点（平方距离比较，免开方）"""
+    dx = ax - bx
+    dy = ay - by
+    return dx * dx + dy * dy <= EPS * EPS
+
+
+@njit(cache=True, fastmath=True)
+def calc_alpha_nb(px: float, py: float, ux: float, uy: float,
+                  vx: float, vy: float) -> float:
+    """交点 (px,py) 在边 (ux,uy)->(vx,vy) 上的参数（投影并截断到 [0,1]）"""
+    dx = vx - ux
+    dy = vy - uy
+    denom = dx * dx + dy * dy
+    if denom < EPS:
+        return 0.0
+    t = ((px - ux) * dx + (py - uy) * dy) / denom
+    if t < 0.0:
+        return 0.0
+    if t > 1.0:
+        return 1.0
+    return t
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def find_all_intersections(ax, ay, bx, by, cx, cy, dx, dy):
+    """
+    两组边的全对求交，外层 prange 并行。第一遍统计每条主边的命中数，
+    前缀和定位写入偏移后第二遍填充，避免并行追加。只收平坦数组
+    （float64 / int64），不经手 Python 对象。
+    返回 (i_idx, j_idx, ipx, ipy, a_alpha, b_alpha) 六个数组。
+    """
+    n = ax.shape[0]
+    m = cx.shape[0]
+    counts = np.zeros(n + 1, dtype=np.int64)
+    for i in prange(n):
+        cnt = 0
+        for j in range(m):
+            _, _, hit = seg_intersect_nb(ax[i], ay[i], bx[i], by[i],
+                                         cx[j], cy[j], dx[j], dy[j])
+            if hit:
+                cnt += 1
+        counts[i + 1] = cnt
+    offsets = np.cumsum(counts)
+    total = offsets[n]
+    i_idx = np.empty(total, dtype=np.int64)
+    j_idx = np.empty(total, dtype=np.int64)
+    ipx = np.empty(total, dtype=np.float64)
+    ipy = np.empty(total, dtype=np.float64)
+    a_alpha = np.empty(total, dtype=np.float64)
+    b_alpha = np.empty(total, dtype=np.float64)
+    for i in prange(n):
+        pos = offsets[i]
+        for j in range(m):
+            px, py, hit = seg_intersect_nb(ax[i], ay[i], bx[i], by[i],
+                                           cx[j], cy[j], dx[j], dy[j])
+            if hit:
+                i_idx[pos] = i
+                j_idx[pos] = j
+                ipx[pos] = px
+                ipy[pos] = py
+                a_alpha[pos] = calc_alpha_nb(px, py, ax[i], ay[i], bx[i], by[i])
+                b_alpha[pos] = calc_alpha_nb(px, py, cx[j], cy[j], dx[j], dy[j])
+                pos += 1
+    return i_idx, j_idx, ipx, ipy, a_alpha, b_alpha
+
+
+# 模块导入时用 4 顶点哑环预热 JIT 缓存，避免首次交互操作卡顿
+_warm_ring = np.array([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)],
+                      dtype=np.float64)
+point_in_ring_nb(_warm_ring, 0.5, 0.5)
+seg_intersect_nb(0.0, 0.0, 1.0, 1.0, 0.0, 1.0, 1.0, 0.0)
+seg_intersect_many_nb(_warm_ring[:, 0], _warm_ring[:, 1],
+                      _warm_ring[:, 1], _warm_ring[:, 0], 0.0, 0.0, 1.0, 1.0)
+point_eq_nb(0.0, 0.0, 1.0, 1.0)
+calc_alpha_nb(0.5, 0.5, 0.0, 0.0, 1.0, 1.0)
+find_all_intersections(_warm_ring[:, 0], _warm_ring[:, 1],
+                       _warm_ring[:, 1], _warm_ring[:, 0],
+                       _warm_ring[:, 0], _warm_ring[:, 1],
+                       _warm_ring[:, 1], _warm_ring[:, 0])
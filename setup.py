@@ -0,0 +1,16 @@
+# setup.py
+# 可选的 C 扩展构建脚本：python setup.py build_ext --inplace
+# 编译 _wa.pyx（Weiler-Atherton 跟踪循环的 C 实现）。
+# 未编译时程序自动退回纯 Python 实现，功能不受影响。
+from setuptools import setup, Extension
+
+from Cython.Build import cythonize
+
+setup(
+    name="weiler-atherton-ext",
+    ext_modules=cythonize(
+        [Extension("_wa", ["_wa.pyx"],
+                   extra_compile_args=["-O3", "-ffast-math"])],
+        language_level=3,
+    ),
+)